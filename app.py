@@ -4,18 +4,41 @@ MTA Subway Tracker - Flask API Backend
 Serves real-time train data via REST API
 """
 
-from flask import Flask, jsonify, send_from_directory, request
+from flask import Flask, Response, jsonify, send_from_directory, request
 from flask_cors import CORS
+import numpy as np
 import threading
 import time
+import struct
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from multiprocessing import shared_memory
 from datetime import datetime, timedelta, timezone
-import requests
-import csv
+import httpx
+import orjson
+import hashlib
 import json
+import pandas as pd
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 import os
+from collections import namedtuple
+from dataclasses import dataclass
+
+# Force the native protobuf backend (upb on protobuf >=4.21, cpp on older
+# builds) before gtfs_realtime_pb2 is imported. The pure-Python fallback is
+# 10-60x slower at ParseFromString and dominates feed refresh CPU, so a
+# deploy that silently falls back would regress badly - fail loudly instead.
+os.environ.setdefault('PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION', 'upb')
 from google.transit import gtfs_realtime_pb2
+from google.protobuf.internal import api_implementation
+
+if api_implementation.Type() not in ('cpp', 'upb'):
+    raise RuntimeError(
+        f"protobuf is using the pure-Python backend "
+        f"({api_implementation.Type()}); install protobuf>=4.25 so the "
+        f"native upb wheels are used"
+    )
 
 app = Flask(__name__, static_folder='static', static_url_path='')
 
@@ -39,7 +62,11 @@ FEED_URLS = {
 }
 STOPS_FILE = "stops.txt"
 UPDATE_INTERVAL = 10  # seconds - how often to poll MTA feeds
+MAX_UPDATE_INTERVAL = 60  # seconds - backoff cap for feeds that rarely change
+UNCHANGED_POLLS_BEFORE_BACKOFF = 3  # identical polls before an interval doubles
 DATA_STALE_THRESHOLD = 60  # seconds - mark health as degraded if data older than this
+TRAINS_SHM_NAME = os.environ.get('TRAINS_SHM_NAME', 'mta_trains')
+TRAINS_SHM_SIZE = 16 * 1024 * 1024  # largest observed payload with headroom
 PORT = int(os.environ.get('PORT', 5001))  # Use PORT from environment (Fly.io) or default to 5001
 
 # Structured Logging Setup
@@ -63,9 +90,15 @@ file_handler = RotatingFileHandler(
 file_handler.setFormatter(log_formatter)
 file_handler.setLevel(getattr(logging, log_level))
 
-# Configure app logger
-app.logger.addHandler(console_handler)
-app.logger.addHandler(file_handler)
+# Configure app logger. Records are pushed onto a queue and formatted /
+# written by a listener thread, so a log call on the request or updater
+# path costs a queue append instead of synchronous file I/O.
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(
+    _log_queue, console_handler, file_handler, respect_handler_level=True
+)
+_log_listener.start()
+app.logger.addHandler(QueueHandler(_log_queue))
 app.logger.setLevel(getattr(logging, log_level))
 
 # Global state
@@ -74,7 +107,56 @@ train_data = {
     'last_updated': None,
     'feed_version': None
 }
-stops_data = {}
+# Stops as a structure-of-arrays: one id->index dict plus parallel
+# name/lat/lon columns. Resolving a stop costs one dict lookup and three
+# array indexes, and the coordinate columns stay contiguous in memory.
+StopsIndex = namedtuple('StopsIndex', ['id_to_idx', 'names', 'lats', 'lons'])
+EMPTY_STOPS = StopsIndex({}, [], np.empty(0), np.empty(0))
+stops_data = EMPTY_STOPS
+
+# Latest serialized /api/trains payload, written by the updater once per
+# poll and handed out to every request in between. Readers just grab the
+# current reference (an atomic operation under the GIL); the lock only
+# serializes writers.
+_trains_payload = orjson.dumps(train_data)
+_trains_payload_lock = threading.Lock()
+
+# When poller.py runs as a separate process (the gunicorn deployment), it
+# publishes the payload through a shared memory region laid out as a
+# little-endian u32 length followed by the JSON bytes. Workers attach
+# lazily and read it without any IPC or locking.
+_trains_shm = None
+
+
+def _publish_trains_payload(shm, payload):
+    """Write the payload into the shared region for other processes
+
+    The length is zeroed before the body is written and restored after,
+    so a reader never treats a half-written body as valid.
+    """
+    if len(payload) + 4 > shm.size:
+        app.logger.error(
+            f"Trains payload ({len(payload)} bytes) exceeds shared memory "
+            f"region ({shm.size} bytes); not publishing"
+        )
+        return
+    struct.pack_into('<I', shm.buf, 0, 0)
+    shm.buf[4:4 + len(payload)] = payload
+    struct.pack_into('<I', shm.buf, 0, len(payload))
+
+
+def _read_shared_trains_payload():
+    """Return the payload published by an external poller, or None"""
+    global _trains_shm
+    if _trains_shm is None:
+        try:
+            _trains_shm = shared_memory.SharedMemory(name=TRAINS_SHM_NAME)
+        except FileNotFoundError:
+            return None  # No poller process running
+    (length,) = struct.unpack_from('<I', _trains_shm.buf, 0)
+    if not length:
+        return None
+    return bytes(_trains_shm.buf[4:4 + length])
 
 
 # Security Headers Middleware
@@ -94,28 +176,72 @@ def add_security_headers(response):
 
 
 def load_stops(stops_file):
-    """Load station information from stops.txt"""
-    stops = {}
+    """Load station information from stops.txt
+
+    Returns a StopsIndex whose columns come straight from the parsed
+    frame, so coordinates live in two contiguous float64 arrays instead
+    of one 3-field dict per stop.
+    """
+    stops = EMPTY_STOPS
     try:
-        with open(stops_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                stops[row['stop_id']] = {
-                    'name': row['stop_name'],
-                    'lat': float(row['stop_lat']),
-                    'lon': float(row['stop_lon'])
-                }
-        app.logger.info(f"Loaded {len(stops)} stops from {stops_file}")
+        df = pd.read_csv(
+            stops_file,
+            usecols=['stop_id', 'stop_name', 'stop_lat', 'stop_lon'],
+            dtype={'stop_id': str, 'stop_name': str,
+                   'stop_lat': 'float64', 'stop_lon': 'float64'}
+        )
+        stops = StopsIndex(
+            id_to_idx={stop_id: idx for idx, stop_id in enumerate(df['stop_id'])},
+            names=df['stop_name'].tolist(),
+            lats=df['stop_lat'].to_numpy(),
+            lons=df['stop_lon'].to_numpy()
+        )
+        app.logger.info(f"Loaded {len(stops.id_to_idx)} stops from {stops_file}")
     except Exception as e:
         app.logger.error(f"Error loading stops from {stops_file}: {e}")
     return stops
 
 
+# Shared HTTP client so TCP+TLS handshakes are reused between polls
+# instead of paying a full handshake per feed every 10 seconds. With
+# HTTP/2 the parallel feed fetches multiplex over a single connection.
+_http_session = httpx.Client(
+    http2=True,
+    timeout=10.0,
+    limits=httpx.Limits(max_keepalive_connections=8)
+)
+
+
+# Conditional-GET state per feed URL. MTA feeds often don't change between
+# 10s polls; sending the validators back lets the server answer 304 and
+# saves both the transfer and the re-parse.
+FEED_UNCHANGED = object()  # sentinel: feed not modified since last poll
+_feed_cache = {}
+
+
 def fetch_gtfs_feed(url):
-    """Fetch the GTFS-RT protobuf feed from MTA"""
+    """Fetch the GTFS-RT protobuf feed from MTA
+
+    Sends If-None-Match / If-Modified-Since from the previous response and
+    returns the FEED_UNCHANGED sentinel when the server answers 304.
+    """
+    headers = {}
+    cached = _feed_cache.get(url)
+    if cached:
+        if cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+
     try:
-        response = requests.get(url, timeout=10)
+        response = _http_session.get(url, headers=headers)
+        if response.status_code == 304:
+            return FEED_UNCHANGED
         response.raise_for_status()
+        _feed_cache[url] = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
+        }
         return response.content
     except Exception as e:
         app.logger.warning(f"Error fetching feed from {url}: {e}")
@@ -129,99 +255,184 @@ def parse_feed(feed_data):
     return feed
 
 
+# Slotted dataclasses instead of dicts for the per-train payload: no
+# per-instance __dict__, so a poll's worth of trains allocates a fraction
+# of the memory and GC churn. orjson serializes dataclasses natively.
+@dataclass(slots=True)
+class Position:
+    """A lat/lon pair on the map"""
+    lat: float
+    lon: float
+
+
+@dataclass(slots=True)
+class StopInfo:
+    """The stop a train is currently heading to"""
+    stop_id: str
+    stop_name: str
+    arrival_timestamp: int | None
+    departure_timestamp: int | None
+
+
+@dataclass(slots=True)
+class TrainInfo:
+    """One active train in the /api/trains payload"""
+    trip_id: str
+    route_id: str
+    direction_id: int | None
+    next_stop: StopInfo
+    position: Position | None = None
+    prev_position: Position | None = None
+    next_position: Position | None = None
+
+
+def _find_current_stop(arrival_times, now_ts):
+    """Return the index of the first stop with a future arrival, or -1.
+
+    Operates on the packed per-trip arrival buffer; entries of 0 mark
+    stops without an arrival time and never compare as future.
+    """
+    future = np.flatnonzero(arrival_times > now_ts)
+    return int(future[0]) if future.size else -1
+
+
 def extract_train_positions(feed, stops):
     """Extract active train information with positions"""
     trains = []
-    current_time = datetime.now(timezone.utc)
+    now_ts = int(time.time())
 
-    for entity in feed.entity:
-        if entity.HasField('trip_update'):
-            trip_update = entity.trip_update
-            trip = trip_update.trip
-
-            # Extract basic trip information
-            train_info = {
-                'trip_id': trip.trip_id,
-                'route_id': trip.route_id,
-                'direction_id': trip.direction_id if trip.HasField('direction_id') else None,
-                'stops': [],
-                'current_stop_index': None,
-                'position': None  # Will be calculated
-            }
-
-            # Extract stop time updates
-            for idx, stop_update in enumerate(trip_update.stop_time_update):
-                stop_id = stop_update.stop_id
-                stop_data = stops.get(stop_id, {})
-
-                stop_info = {
-                    'stop_id': stop_id,
-                    'stop_name': stop_data.get('name', stop_id),
-                    'lat': stop_data.get('lat'),
-                    'lon': stop_data.get('lon'),
-                    'arrival_time': None,
-                    'departure_time': None,
-                    'arrival_timestamp': None
-                }
+    # Hoist lookups out of the per-stop loop; with thousands of trains and
+    # ~20 stop updates each per poll, repeated dict/method dispatch adds up.
+    idx_get = stops.id_to_idx.get
+    stop_names = stops.names
+    stop_lats = stops.lats
+    stop_lons = stops.lons
 
-                if stop_update.HasField('arrival'):
-                    arrival_dt = datetime.fromtimestamp(stop_update.arrival.time, tz=timezone.utc)
-                    stop_info['arrival_time'] = arrival_dt.strftime('%H:%M:%S')
-                    stop_info['arrival_timestamp'] = stop_update.arrival.time
-
-                if stop_update.HasField('departure'):
-                    departure_dt = datetime.fromtimestamp(stop_update.departure.time, tz=timezone.utc)
-                    stop_info['departure_time'] = departure_dt.strftime('%H:%M:%S')
-
-                train_info['stops'].append(stop_info)
-
-                # Determine current/next stop - find first stop with future arrival time
-                if train_info['current_stop_index'] is None:
-                    if stop_info['arrival_timestamp']:
-                        if arrival_dt > current_time:
-                            train_info['current_stop_index'] = idx
-
-            # If no future stops found, train may have completed route - skip it
-            if train_info['current_stop_index'] is None:
-                continue  # Skip this train, it has no upcoming stops
-
-            # Calculate position and direction
-            if train_info['current_stop_index'] is not None:
-                current_idx = train_info['current_stop_index']
-                next_stop = train_info['stops'][current_idx]
-
-                if next_stop['lat'] and next_stop['lon']:
-                    train_info['position'] = {
-                        'lat': next_stop['lat'],
-                        'lon': next_stop['lon']
-                    }
-
-                    # Get previous stop for direction calculation
-                    if current_idx > 0:
-                        prev_stop = train_info['stops'][current_idx - 1]
-                        if prev_stop['lat'] and prev_stop['lon']:
-                            train_info['prev_position'] = {
-                                'lat': prev_stop['lat'],
-                                'lon': prev_stop['lon']
-                            }
-
-                    # Get next next stop for better direction if at current stop
-                    if current_idx < len(train_info['stops']) - 1:
-                        next_next_stop = train_info['stops'][current_idx + 1]
-                        if next_next_stop['lat'] and next_next_stop['lon']:
-                            train_info['next_position'] = {
-                                'lat': next_next_stop['lat'],
-                                'lon': next_next_stop['lon']
-                            }
-
-            trains.append(train_info)
+    for entity in feed.entity:
+        # Non-trip entities (vehicle positions, alerts) read trip_update
+        # as the default instance with an empty stop_time_update, so an
+        # emptiness check replaces the HasField descriptor lookup here too
+        trip_update = entity.trip_update
+        stop_updates = trip_update.stop_time_update
+        if not stop_updates:
+            continue
+        trip = trip_update.trip
+
+        # First pass: pack arrival epochs into a flat int64 buffer and
+        # locate the current stop before building any per-stop objects,
+        # so trains with no upcoming stops cost no dict allocations.
+        arrival_times = np.empty(len(stop_updates), dtype=np.int64)
+        for idx, stop_update in enumerate(stop_updates):
+            # Unset arrival reads as the default instance whose time is
+            # 0, so a zero check doubles as the "missing" test and skips
+            # a HasField descriptor lookup per stop.
+            arrival_times[idx] = stop_update.arrival.time
+
+        current_idx = _find_current_stop(arrival_times, now_ts)
+        if current_idx < 0:
+            continue  # Skip this train, it has no upcoming stops
+
+        # Only the current stop and its neighbours are ever read - by
+        # the position math here and by the frontend popup - so build
+        # objects for those instead of one per stop update. Ship raw
+        # epoch seconds and let the frontend format the time of day.
+        current_stop = stop_updates[current_idx]
+        sidx = idx_get(current_stop.stop_id, -1)
+
+        train_info = TrainInfo(
+            trip_id=trip.trip_id,
+            route_id=trip.route_id,
+            # direction_id keeps its HasField: 0 is a real direction
+            # (uptown) that the frontend must tell apart from unset, and
+            # this lookup is per trip, not per stop
+            direction_id=trip.direction_id if trip.HasField('direction_id') else None,
+            next_stop=StopInfo(
+                stop_id=current_stop.stop_id,
+                stop_name=stop_names[sidx] if sidx >= 0 else current_stop.stop_id,
+                arrival_timestamp=current_stop.arrival.time or None,
+                departure_timestamp=current_stop.departure.time or None
+            )
+        )
+
+        # Calculate position and direction; float() unwraps np.float64
+        # so the payload stays plain-Python for orjson
+        if sidx >= 0:
+            train_info.position = Position(
+                float(stop_lats[sidx]), float(stop_lons[sidx])
+            )
+
+            # Get previous stop for direction calculation
+            if current_idx > 0:
+                pidx = idx_get(stop_updates[current_idx - 1].stop_id, -1)
+                if pidx >= 0:
+                    train_info.prev_position = Position(
+                        float(stop_lats[pidx]), float(stop_lons[pidx])
+                    )
+
+            # Get next next stop for better direction if at current stop
+            if current_idx < len(stop_updates) - 1:
+                nidx = idx_get(stop_updates[current_idx + 1].stop_id, -1)
+                if nidx >= 0:
+                    train_info.next_position = Position(
+                        float(stop_lats[nidx]), float(stop_lons[nidx])
+                    )
+
+        trains.append(train_info)
 
     return trains
 
 
-def update_train_data():
-    """Background task to fetch and update train data from all feeds"""
-    global train_data
+def _init_extract_worker(stops):
+    """Pin the stops index into an extract worker's globals (runs once
+    per worker, so stops are never re-pickled per task)"""
+    global stops_data
+    stops_data = stops
+
+
+def _parse_and_extract(feed_data):
+    """Parse one feed payload and extract its trains (runs in a worker)"""
+    return extract_train_positions(parse_feed(feed_data), stops_data)
+
+
+def update_train_data(shm=None):
+    """Fetch and update train data from all feeds in a loop
+
+    Runs as a daemon thread in standalone mode. When `shm` is given (the
+    dedicated poller process), each poll's payload is also published to
+    the shared memory region for the Flask workers.
+    """
+    global train_data, _trains_payload
+
+    # Most recently extracted trains per feed, reused when a poll comes
+    # back 304 Not Modified or with a byte-identical payload
+    last_feed_trains = {}
+    last_feed_hash = {}
+
+    # Per-feed adaptive polling: a feed that keeps coming back unchanged
+    # (quiet lines, off-peak hours) has its interval doubled up to a cap,
+    # and snaps back to UPDATE_INTERVAL on the first real change
+    feed_interval = {name: UPDATE_INTERVAL for name in FEED_URLS}
+    feed_next_due = {name: 0.0 for name in FEED_URLS}
+    feed_unchanged_streak = {name: 0 for name in FEED_URLS}
+
+    def mark_unchanged(feed_name):
+        feed_unchanged_streak[feed_name] += 1
+        if feed_unchanged_streak[feed_name] >= UNCHANGED_POLLS_BEFORE_BACKOFF:
+            feed_interval[feed_name] = min(
+                feed_interval[feed_name] * 2, MAX_UPDATE_INTERVAL
+            )
+
+    def mark_changed(feed_name):
+        feed_unchanged_streak[feed_name] = 0
+        feed_interval[feed_name] = UPDATE_INTERVAL
+
+    # Parse + extract is compute-bound and GIL-held, so changed feeds are
+    # sharded across worker processes while the fetches overlap in threads
+    extract_pool = ProcessPoolExecutor(
+        max_workers=min(4, len(FEED_URLS)),
+        initializer=_init_extract_worker,
+        initargs=(stops_data,)
+    )
 
     while True:
         try:
@@ -229,29 +440,102 @@ def update_train_data():
 
             all_trains = []
             feed_counts = {}
+            # Even a suppressed debug call pays for its f-string; check
+            # the level once per poll and skip the formatting entirely
+            debug_enabled = app.logger.isEnabledFor(logging.DEBUG)
+
+            # Fetch all feeds in parallel - the work is I/O-bound on MTA
+            # latency, so wall time drops from the sum of the per-feed
+            # round trips to the slowest single one
+            # Only poll feeds whose interval has elapsed; the rest keep
+            # serving their previous extraction until they come due
+            due_feeds = [
+                name for name in FEED_URLS
+                if feed_next_due[name] <= time.monotonic()
+            ]
+            for feed_name in FEED_URLS:
+                if feed_name not in due_feeds:
+                    trains = last_feed_trains.get(feed_name, [])
+                    all_trains.extend(trains)
+                    feed_counts[feed_name] = len(trains)
+
+            extract_futures = {}
+            with ThreadPoolExecutor(max_workers=len(FEED_URLS)) as executor:
+                futures = {
+                    executor.submit(fetch_gtfs_feed, FEED_URLS[feed_name]): feed_name
+                    for feed_name in due_feeds
+                }
+                for future in as_completed(futures):
+                    feed_name = futures[future]
+                    try:
+                        feed_data = future.result()
+                        if feed_data is FEED_UNCHANGED:
+                            trains = last_feed_trains.get(feed_name, [])
+                            all_trains.extend(trains)
+                            feed_counts[feed_name] = len(trains)
+                            mark_unchanged(feed_name)
+                            if debug_enabled:
+                                app.logger.debug(f"{feed_name}: not modified, reusing {len(trains)} trains")
+                        elif feed_data:
+                            # Feeds that come back 200 are still often
+                            # byte-identical between polls; hashing costs
+                            # microseconds vs milliseconds for the re-parse
+                            payload_hash = hashlib.blake2b(feed_data, digest_size=16).digest()
+                            if payload_hash == last_feed_hash.get(feed_name):
+                                trains = last_feed_trains.get(feed_name, [])
+                                all_trains.extend(trains)
+                                feed_counts[feed_name] = len(trains)
+                                mark_unchanged(feed_name)
+                                if debug_enabled:
+                                    app.logger.debug(f"{feed_name}: payload unchanged, reusing {len(trains)} trains")
+                            else:
+                                # Changed payload: decode it on the pool
+                                # while the remaining fetches complete
+                                extract_futures[extract_pool.submit(
+                                    _parse_and_extract, feed_data
+                                )] = (feed_name, payload_hash)
+                        else:
+                            app.logger.warning(f"{feed_name}: Failed to fetch")
+                            feed_counts[feed_name] = 0
+                    except Exception as e:
+                        app.logger.error(f"{feed_name}: Error - {e}")
+                        feed_counts[feed_name] = 0
 
-            # Fetch from all feed URLs
-            for feed_name, feed_url in FEED_URLS.items():
+            # Gather the sharded parse results
+            for future in as_completed(extract_futures):
+                feed_name, payload_hash = extract_futures[future]
                 try:
-                    feed_data = fetch_gtfs_feed(feed_url)
-                    if feed_data:
-                        feed = parse_feed(feed_data)
-                        trains = extract_train_positions(feed, stops_data)
-                        all_trains.extend(trains)
-                        feed_counts[feed_name] = len(trains)
+                    trains = future.result()
+                    last_feed_trains[feed_name] = trains
+                    last_feed_hash[feed_name] = payload_hash
+                    all_trains.extend(trains)
+                    feed_counts[feed_name] = len(trains)
+                    mark_changed(feed_name)
+                    if debug_enabled:
                         app.logger.debug(f"{feed_name}: {len(trains)} trains")
-                    else:
-                        app.logger.warning(f"{feed_name}: Failed to fetch")
-                        feed_counts[feed_name] = 0
                 except Exception as e:
                     app.logger.error(f"{feed_name}: Error - {e}")
                     feed_counts[feed_name] = 0
 
+            # Reschedule the feeds polled this cycle at their (possibly
+            # backed-off) intervals
+            now_mono = time.monotonic()
+            for feed_name in due_feeds:
+                feed_next_due[feed_name] = now_mono + feed_interval[feed_name]
+
             # Update global state
             train_data['trains'] = all_trains
             train_data['last_updated'] = datetime.now(timezone.utc).isoformat()
             train_data['feed_counts'] = feed_counts
 
+            # Serialize once per poll so request handlers can hand out the
+            # same cached bytes instead of re-encoding per client
+            payload = orjson.dumps(train_data)
+            with _trains_payload_lock:
+                _trains_payload = payload
+            if shm is not None:
+                _publish_trains_payload(shm, payload)
+
             app.logger.info(f"Total: {len(all_trains)} active trains across all lines")
 
         except Exception as e:
@@ -269,32 +553,65 @@ def index():
 @app.route('/api/trains')
 def get_trains():
     """API endpoint to get current train data"""
-    app.logger.debug(f"Serving train data from memory (client: {request.remote_addr})")
-    return jsonify(train_data)
+    if app.logger.isEnabledFor(logging.DEBUG):
+        app.logger.debug(f"Serving train data from memory (client: {request.remote_addr})")
+    # Serve the bytes the updater serialized for this poll; the data only
+    # changes every UPDATE_INTERVAL, so re-encoding per client would be
+    # redundant work. A dedicated poller process takes precedence over
+    # the in-process thread.
+    payload = _read_shared_trains_payload()
+    if payload is None:
+        payload = _trains_payload
+    return Response(payload, mimetype='application/json')
 
 
-@app.route('/api/stops')
-def get_stops():
-    """API endpoint to get all stop locations"""
-    # Convert stops dict to list for easier frontend consumption
+# Pre-serialized /api/stops response; stops are loaded once at startup and
+# never mutated, so the JSON is encoded once instead of per request
+_stops_payload = b'{"stops": []}'
+_stops_etag = None
+
+
+def build_stops_payload():
+    """Serialize the /api/stops response once from the loaded stops"""
+    global _stops_payload, _stops_etag
+
+    # Convert the stops columns to a list for easier frontend consumption
     stops_list = [
         {
             'stop_id': stop_id,
-            'name': data['name'],
-            'lat': data['lat'],
-            'lon': data['lon']
+            'name': stops_data.names[idx],
+            'lat': float(stops_data.lats[idx]),
+            'lon': float(stops_data.lons[idx])
         }
-        for stop_id, data in stops_data.items()
-        if data.get('lat') and data.get('lon')
+        for stop_id, idx in stops_data.id_to_idx.items()
+        if stops_data.lats[idx] and stops_data.lons[idx]
     ]
-    return jsonify({'stops': stops_list})
+    _stops_payload = json.dumps({'stops': stops_list}).encode('utf-8')
+    _stops_etag = f'"{hashlib.blake2b(_stops_payload, digest_size=16).hexdigest()}"'
+
+
+@app.route('/api/stops')
+def get_stops():
+    """API endpoint to get all stop locations"""
+    if _stops_etag and request.headers.get('If-None-Match') == _stops_etag:
+        return Response(status=304)
+
+    response = Response(_stops_payload, mimetype='application/json')
+    if _stops_etag:
+        response.headers['ETag'] = _stops_etag
+    return response
 
 
 @app.route('/api/health')
 def health():
     """Health check endpoint with staleness detection"""
-    last_update = train_data.get('last_updated')
-    active_trains = len(train_data.get('trains', []))
+    # In the split deployment the authoritative data lives in the poller
+    # process; decode its published payload (health traffic is light)
+    payload = _read_shared_trains_payload()
+    current = orjson.loads(payload) if payload is not None else train_data
+
+    last_update = current.get('last_updated')
+    active_trains = len(current.get('trains', []))
 
     status = 'ok'
     reason = None
@@ -321,7 +638,7 @@ def health():
         'status': status,
         'last_updated': last_update,
         'active_trains': active_trains,
-        'feed_counts': train_data.get('feed_counts', {}),
+        'feed_counts': current.get('feed_counts', {}),
         'hello': "world"
     }
 
@@ -340,6 +657,7 @@ if __name__ == '__main__':
     # Load stops data
     print("\nLoading station data...")
     stops_data = load_stops(STOPS_FILE)
+    build_stops_payload()
 
     # Start background thread for updating train data
     print("Starting background feed updater...")
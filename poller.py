@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+MTA Subway Tracker - Feed Poller
+Polls the MTA feeds in a dedicated process and publishes the serialized
+train payload through shared memory for the Flask workers.
+
+Run alongside gunicorn:
+
+    python poller.py &
+    gunicorn -w 4 app:app
+
+One poller feeds every worker, so N workers no longer mean N independent
+polling loops hitting MTA.
+"""
+
+from multiprocessing import shared_memory
+
+import app as tracker
+from app import TRAINS_SHM_NAME, TRAINS_SHM_SIZE, STOPS_FILE
+
+
+def main():
+    try:
+        shm = shared_memory.SharedMemory(
+            name=TRAINS_SHM_NAME, create=True, size=TRAINS_SHM_SIZE
+        )
+    except FileExistsError:
+        # Region left over from a previous run - reuse it
+        shm = shared_memory.SharedMemory(name=TRAINS_SHM_NAME)
+
+    tracker.stops_data = tracker.load_stops(STOPS_FILE)
+    tracker.app.logger.info(
+        f"Poller started, publishing to shared memory '{TRAINS_SHM_NAME}'"
+    )
+    tracker.update_train_data(shm=shm)
+
+
+if __name__ == '__main__':
+    main()